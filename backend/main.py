@@ -4,8 +4,11 @@ GreenWatch AI — FastAPI Backend
 Greenwashing Detection System aligned with SDG Goal 15
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional
 import uvicorn
@@ -24,7 +27,8 @@ from modules.predictive_engine import (
 app = FastAPI(
     title="GreenWatch AI — Greenwashing Detection API",
     description="AI-powered greenwashing detection aligned with SDG Goal 15: Life on Land",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Allow React frontend to call this API
@@ -52,7 +56,7 @@ class LiveTextRequest(BaseModel):
 # ─── Routes ───────────────────────────────────────────────────────────────────
 
 @app.get("/")
-def root():
+async def root():
     return {
         "name": "GreenWatch AI",
         "version": "0.1.0",
@@ -62,26 +66,28 @@ def root():
 
 
 @app.post("/analyze")
-def analyze_product(submission: ProductSubmission):
+async def analyze_product(submission: ProductSubmission):
     """
     Full greenwashing analysis pipeline.
     Extracts claims, verifies certificates, scores risk, maps to SDG 15.
     """
     full_text = f"{submission.product_title}. {submission.product_description}"
 
-    # Stage 1: NLP extraction
-    nlp_result = extract_claims(full_text)
+    # Stages 1 & 2: NLP extraction and certificate verification are
+    # independent, so run them concurrently
+    nlp_result, cert_result = await asyncio.gather(
+        asyncio.to_thread(extract_claims, full_text),
+        asyncio.to_thread(
+            verify_certificates,
+            submission.company_name,
+            submission.claimed_certifications,
+            submission.product_category
+        )
+    )
     claims = nlp_result["claims"]
     red_flags = nlp_result["red_flags"]
     has_proof = nlp_result["has_proof_markers"]
     ai_risk = nlp_result["is_ai_generated_risk"]
-
-    # Stage 2: Certificate verification
-    cert_result = verify_certificates(
-        submission.company_name,
-        submission.claimed_certifications,
-        submission.product_category
-    )
     cert_verifications = cert_result["verification_results"]
 
     # Stage 3: Risk scoring
@@ -124,7 +130,7 @@ def analyze_product(submission: ProductSubmission):
             "risk_score": risk["risk_score"],
             "verdict": risk["verdict"],
             "score_breakdown": risk["score_breakdown"],
-            "visibility_impact": risk["visibility_impact"]
+            "visibility_impact": dict(risk["visibility_impact"])  # shared read-only mapping
         },
         "seller_history": {
             "alert_level": prior_profile.get("alert_level", "LOW"),
@@ -135,13 +141,13 @@ def analyze_product(submission: ProductSubmission):
 
 
 @app.post("/analyze-live")
-def analyze_live(request: LiveTextRequest):
+async def analyze_live(request: LiveTextRequest):
     """
     Real-time claim interception as seller types.
     Returns immediate warnings for greenwashing phrases.
     Lightweight — keyword matching only, no cert check.
     """
-    nlp_result = extract_claims(request.text)
+    nlp_result = await asyncio.to_thread(extract_claims, request.text)
 
     warnings = []
     for claim in nlp_result["claims"]:
@@ -166,25 +172,28 @@ def analyze_live(request: LiveTextRequest):
 
 
 @app.get("/seller/{company_name}/profile")
-def seller_profile(company_name: str):
+async def seller_profile(company_name: str):
     """Get risk profile and submission history for a specific seller."""
     return get_seller_risk_profile(company_name)
 
 
 @app.get("/regulator/alerts")
-def early_alerts():
+async def early_alerts():
     """Get early alert list of high-risk sellers for regulator dashboard."""
     return {"alerts": get_early_alerts()}
 
 
 @app.get("/regulator/submissions")
-def all_submissions():
-    """Get full audit log of all submissions."""
-    return {"submissions": get_all_submissions()}
+async def all_submissions(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """Get a page of the audit log, most recent submissions first."""
+    return {"submissions": get_all_submissions(limit, offset)}
 
 
 @app.get("/regulator/stats")
-def platform_stats():
+async def platform_stats():
     """Get aggregate platform statistics for regulator overview."""
     return get_platform_stats()
 
@@ -4,14 +4,21 @@ Certificate cross-reference and scope matching engine.
 Checks existence, validity, expiry, and product category applicability.
 """
 
-import json
-from datetime import datetime, date
+from datetime import date
 from pathlib import Path
 
+import orjson
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 
-with open(DATA_DIR / "cert_registry.json") as f:
-    REGISTRY = json.load(f)
+REGISTRY = orjson.loads((DATA_DIR / "cert_registry.json").read_bytes())
+
+# Precompute per-record lookups once instead of on every verification
+_REGISTRY_INDEX: dict[tuple[str, str], dict] = {}
+for _record in REGISTRY:
+    _record["_applicable_lower"] = frozenset(c.lower() for c in _record["applicable_categories"])
+    _record["_expiry_date"] = date.fromisoformat(_record["expiry"])
+    _REGISTRY_INDEX.setdefault((_record["company"].lower(), _record["cert_type"].lower()), _record)
 
 # Certification guidance for SME remediation pathways
 CERT_GUIDANCE = {
@@ -117,7 +124,8 @@ def verify_certificates(company_name: str, claimed_certs: list[str], product_cat
         results.append(result)
 
     # Also flag unclaimed but potentially required certs
-    missing_required = _identify_missing_certs(product_category, claimed_certs)
+    claimed_set = {c.lower() for c in claimed_certs}
+    missing_required = _identify_missing_certs(product_category, claimed_set)
     
     return {
         "verification_results": results,
@@ -128,14 +136,10 @@ def verify_certificates(company_name: str, claimed_certs: list[str], product_cat
 
 def _verify_single_cert(company: str, cert_type: str, category: str) -> dict:
     """Verify a single certificate claim."""
-    # Find matching records
-    matches = [
-        r for r in REGISTRY
-        if r["company"].lower() == company.lower()
-        and r["cert_type"].lower() == cert_type.lower()
-    ]
+    # Find matching record
+    record = _REGISTRY_INDEX.get((company.lower(), cert_type.lower()))
 
-    if not matches:
+    if record is None:
         return {
             "cert": cert_type,
             "status": "NOT_FOUND",
@@ -145,10 +149,8 @@ def _verify_single_cert(company: str, cert_type: str, category: str) -> dict:
             "registry_checked": True
         }
 
-    record = matches[0]
-
     # Check expiry
-    expiry_date = datetime.strptime(record["expiry"], "%Y-%m-%d").date()
+    expiry_date = record["_expiry_date"]
     today = date.today()
     is_expired = expiry_date < today
     days_until_expiry = (expiry_date - today).days
@@ -165,7 +167,7 @@ def _verify_single_cert(company: str, cert_type: str, category: str) -> dict:
         }
 
     # Check scope / category applicability
-    if category.lower() not in [c.lower() for c in record["applicable_categories"]]:
+    if category.lower() not in record["_applicable_lower"]:
         return {
             "cert": cert_type,
             "status": "SCOPE_MISMATCH",
@@ -197,7 +199,7 @@ def _verify_single_cert(company: str, cert_type: str, category: str) -> dict:
     }
 
 
-def _identify_missing_certs(category: str, claimed: list[str]) -> list[dict]:
+def _identify_missing_certs(category: str, claimed_set: set[str]) -> list[dict]:
     """Identify certifications that are recommended for a product category but not claimed."""
     recommendations = {
         "timber": ["FSC", "PEFC", "Carbon Trust"],
@@ -217,7 +219,7 @@ def _identify_missing_certs(category: str, claimed: list[str]) -> list[dict]:
     recommended = recommendations.get(category.lower(), [])
     missing = [
         {"cert": c, "reason": f"Recommended for {category} products", "guidance": CERT_GUIDANCE.get(c, {})}
-        for c in recommended if c not in claimed
+        for c in recommended if c.lower() not in claimed_set
     ]
     return missing
 
@@ -5,25 +5,110 @@ Uses keyword matching + zero-shot classification for MVP.
 Fine-tuned BERT can replace this in production.
 """
 
-import json
 import re
 import os
+import sys
+from functools import lru_cache
 from pathlib import Path
 
+import ahocorasick
+import orjson
+
 # Load keyword taxonomy
 DATA_DIR = Path(__file__).parent.parent / "data"
 
-with open(DATA_DIR / "greenwashing_keywords.json") as f:
-    KEYWORDS = json.load(f)
+KEYWORDS = orjson.loads((DATA_DIR / "greenwashing_keywords.json").read_bytes())
+
+
+# Base detection confidence per claim type
+_BASE_CONFIDENCE = {
+    "absolute": 0.92,
+    "misleading": 0.85,
+    "vague": 0.78
+}
+
+
+def _build_phrase_table() -> list[tuple[str, str, float, float]]:
+    """
+    Flatten the keyword taxonomy into (phrase, claim_type, title_confidence,
+    body_confidence) rows. Both confidences are final, rounded values, so
+    scoring a match is a single tuple read.
+    Claim types are interned so downstream lookups keyed on them (e.g.
+    risk_scorer.CLAIM_WEIGHTS) hit on identity rather than string compare.
+    """
+    table = []
+    for claim_type, phrases in KEYWORDS.items():
+        claim_type = sys.intern(claim_type)
+        base_confidence = _BASE_CONFIDENCE.get(claim_type, 0.75)
+        # Phrases in title position (first 50 chars) get a confidence boost
+        title_confidence = round(min(base_confidence + 0.05, 0.99), 2)
+        body_confidence = round(min(base_confidence, 0.99), 2)
+        for phrase in phrases:
+            table.append((phrase, claim_type, title_confidence, body_confidence))
+    return table
+
+
+def _build_automaton() -> ahocorasick.Automaton:
+    """
+    Build a multi-pattern automaton over every keyword phrase so all
+    phrase occurrences are found in a single pass over the text.
+    Each phrase maps to its row index in _PHRASE_TABLE.
+    """
+    automaton = ahocorasick.Automaton()
+    for idx, (phrase, *_) in enumerate(_PHRASE_TABLE):
+        if phrase.lower() not in automaton:
+            automaton.add_word(phrase.lower(), idx)
+    automaton.make_automaton()
+    return automaton
+
+
+_PHRASE_TABLE = _build_phrase_table()
+_AUTOMATON = _build_automaton()
 
 # Linguistic red flags — documented greenwashing tactics
-LINGUISTIC_RED_FLAGS = [
-    r"\b(our commitment to|we are committed to|we strive to|we aim to)\b",  # vague pledges
-    r"\b(up to|as much as|can be|may be)\b",                                 # hedging
-    r"\b(greener|more sustainable|better for|cleaner than)\b",               # unqualified comparatives
-    r"\b(designed with|made with|crafted with|inspired by) nature\b",        # nature-washing
-    r"\b(responsibly|thoughtfully|carefully) (made|sourced|crafted)\b",      # adverb washing
-]
+LINGUISTIC_RED_FLAGS = {
+    "vague_pledge": r"\b(?:our commitment to|we are committed to|we strive to|we aim to)\b",
+    "hedging": r"\b(?:up to|as much as|can be|may be)\b",
+    "unqualified_comparative": r"\b(?:greener|more sustainable|better for|cleaner than)\b",
+    "nature_washing": r"\b(?:designed with|made with|crafted with|inspired by) nature\b",
+    "adverb_washing": r"\b(?:responsibly|thoughtfully|carefully) (?:made|sourced|crafted)\b",
+}
+
+_FLAG_DESCRIPTIONS = {
+    "vague_pledge": "Vague pledge without measurable target",
+    "hedging": "Hedging language undermining claim strength",
+    "unqualified_comparative": "Unqualified comparative — no reference point given",
+    "nature_washing": "Nature-association language without substance",
+    "adverb_washing": "Adverb-washing — adverb not backed by standard",
+}
+
+# All red flags compiled into one alternation so the text is scanned once.
+# Each flag sits in a zero-width lookahead so a match consumes no text and
+# overlapping flags (e.g. "responsibly made with nature") are all found
+_COMBINED_FLAG_RE = re.compile(
+    "|".join(f"(?=(?P<{name}>{pattern}))" for name, pattern in LINGUISTIC_RED_FLAGS.items()),
+    re.IGNORECASE
+)
+
+# Words that AI-written copy tends to over-use
+_GREEN_WORDS = frozenset({
+    "sustainable", "eco", "green", "natural", "organic",
+    "biodegradable", "renewable", "ethical", "responsible", "conscious"
+})
+
+_NUMBER_RE = re.compile(r"\d+%|\d+\s*(?:kg|tonnes|hectares|km)")
+_SENTENCE_SPLIT_RE = re.compile(r"[.!?]+")
+
+# Verifiable proof markers — any one of these counts as substantiation
+_PROOF_RE = re.compile(
+    r"certificate|certified|certification|verified by|audited by|third[- ]party|iso\s"
+    r"|fsc|pefc|rainforest alliance|carbon trust|cites|registration number|cert no|license no",
+    re.IGNORECASE
+)
+
+# Longer texts bypass the extraction cache, which would otherwise keep
+# arbitrarily large request bodies alive for the life of the process
+_MAX_CACHED_TEXT_LEN = 10_000
 
 # Claim type weights for scoring
 CLAIM_TYPE_WEIGHTS = {
@@ -38,42 +123,62 @@ def extract_claims(text: str) -> list[dict]:
     Extract and classify environmental claims from product text.
     Returns list of detected claims with type, confidence, and position.
     """
+    # Sellers resubmit the same copy and /analyze-live re-sends it on every
+    # keystroke, so the analysis is cached; callers get their own copies
+    if len(text) > _MAX_CACHED_TEXT_LEN:
+        cached = _run_extraction(text)
+    else:
+        cached = _extract_claims_cached(text)
+    ai_risk = cached["is_ai_generated_risk"]
+    return {
+        "claims": [dict(c) for c in cached["claims"]],
+        "red_flags": [dict(f) for f in cached["red_flags"]],
+        "has_proof_markers": cached["has_proof_markers"],
+        "claim_count": cached["claim_count"],
+        "is_ai_generated_risk": {**ai_risk, "indicators": list(ai_risk["indicators"])}
+    }
+
+
+@lru_cache(maxsize=2048)
+def _extract_claims_cached(text: str) -> dict:
+    """Cached _run_extraction; results are shared and must not be mutated."""
+    return _run_extraction(text)
+
+
+def _run_extraction(text: str) -> dict:
+    """Run the full extraction pipeline."""
     text_lower = text.lower()
-    detected = []
-    seen_phrases = set()
 
     # 1. Keyword-based extraction
-    for claim_type, phrases in KEYWORDS.items():
-        for phrase in phrases:
-            if phrase.lower() in text_lower and phrase not in seen_phrases:
-                seen_phrases.add(phrase)
-
-                # Find position in original text
-                start_idx = text_lower.find(phrase.lower())
-
-                # Calculate base confidence based on claim type
-                base_confidence = {
-                    "absolute": 0.92,
-                    "misleading": 0.85,
-                    "vague": 0.78
-                }.get(claim_type, 0.75)
-
-                # Boost confidence if phrase is in title position (first 50 chars)
-                position_boost = 0.05 if start_idx < 50 else 0.0
-
-                detected.append({
-                    "phrase": phrase,
-                    "type": claim_type,
-                    "confidence": round(min(base_confidence + position_boost, 0.99), 2),
-                    "position": start_idx,
-                    "context": _extract_context(text, start_idx, len(phrase))
-                })
+    hits = {}
+    for end_idx, idx in _AUTOMATON.iter(text_lower):
+        if idx in hits:
+            continue
+        phrase, claim_type, title_confidence, body_confidence = _PHRASE_TABLE[idx]
+
+        # Position of the first occurrence in original text
+        start_idx = end_idx - len(phrase) + 1
+
+        # Surrounding context, 40 chars either side of the phrase
+        ctx_start = max(0, start_idx - 40)
+        ctx_end = end_idx + 41
+
+        hits[idx] = {
+            "phrase": phrase,
+            "type": claim_type,
+            "confidence": title_confidence if start_idx < 50 else body_confidence,
+            "position": start_idx,
+            "context": f"{'...' if ctx_start else ''}{text[ctx_start:ctx_end]}..."
+        }
+
+    # Report claims in taxonomy order, independent of where they occur
+    detected = [hits[idx] for idx in sorted(hits)]
 
     # 2. Linguistic red flag detection
     red_flags = _detect_red_flags(text)
 
     # 3. Check for missing proof markers
-    has_proof = _has_proof_markers(text_lower)
+    has_proof = _has_proof_markers(text)
 
     return {
         "claims": detected,
@@ -84,48 +189,30 @@ def extract_claims(text: str) -> list[dict]:
     }
 
 
-def _extract_context(text: str, start: int, length: int, window: int = 40) -> str:
-    """Extract surrounding context for a detected claim phrase."""
-    ctx_start = max(0, start - window)
-    ctx_end = min(len(text), start + length + window)
-    snippet = text[ctx_start:ctx_end]
-    return f"...{snippet}..." if ctx_start > 0 else f"{snippet}..."
-
-
 def _detect_red_flags(text: str) -> list[dict]:
     """Detect linguistic patterns associated with greenwashing tactics."""
     flags = []
-    text_lower = text.lower()
-
-    flag_descriptions = {
-        r"\b(our commitment to|we are committed to|we strive to|we aim to)\b": "Vague pledge without measurable target",
-        r"\b(up to|as much as|can be|may be)\b": "Hedging language undermining claim strength",
-        r"\b(greener|more sustainable|better for|cleaner than)\b": "Unqualified comparative — no reference point given",
-        r"\b(designed with|made with|crafted with|inspired by) nature\b": "Nature-association language without substance",
-        r"\b(responsibly|thoughtfully|carefully) (made|sourced|crafted)\b": "Adverb-washing — adverb not backed by standard",
-    }
-
-    for pattern, description in flag_descriptions.items():
-        match = re.search(pattern, text_lower)
-        if match:
-            flags.append({
-                "pattern": match.group(),
-                "description": description,
-                "position": match.start()
-            })
+    seen_flags = set()
+
+    for match in _COMBINED_FLAG_RE.finditer(text):
+        name = match.lastgroup
+        if name in seen_flags:
+            continue
+        seen_flags.add(name)
+        flags.append({
+            "pattern": match.group(name).lower(),
+            "description": _FLAG_DESCRIPTIONS[name],
+            "position": match.start(name)
+        })
+        if len(seen_flags) == len(_FLAG_DESCRIPTIONS):
+            break
 
     return flags
 
 
-def _has_proof_markers(text_lower: str) -> bool:
+def _has_proof_markers(text: str) -> bool:
     """Check if text contains any verifiable proof markers."""
-    proof_markers = [
-        "certificate", "certified", "certification", "verified by",
-        "audited by", "third-party", "third party", "iso ", "fsc",
-        "pefc", "rainforest alliance", "carbon trust", "cites",
-        "registration number", "cert no", "license no"
-    ]
-    return any(marker in text_lower for marker in proof_markers)
+    return _PROOF_RE.search(text) is not None
 
 
 def _assess_ai_generated_risk(text: str) -> dict:
@@ -134,34 +221,32 @@ def _assess_ai_generated_risk(text: str) -> dict:
     Checks for statistical patterns: unusual polish, keyword density, structure.
     """
     words = text.split()
-    if not words:
+    word_count = len(words)
+    # Too short for the statistical indicators to be meaningful
+    if word_count < 15:
         return {"risk": "low", "score": 0, "indicators": []}
 
     indicators = []
     score = 0
 
     # Check keyword density — AI tends to over-optimize
-    green_word_count = sum(1 for w in words if w.lower() in [
-        "sustainable", "eco", "green", "natural", "organic",
-        "biodegradable", "renewable", "ethical", "responsible", "conscious"
-    ])
-    density = green_word_count / len(words)
+    green_word_count = sum(1 for w in words if w.lower() in _GREEN_WORDS)
+    density = green_word_count / word_count
     if density > 0.08:
         score += 30
         indicators.append(f"High green keyword density ({density:.1%})")
 
     # Check for suspiciously perfect sentence structure
-    sentences = text.split(".")
+    sentences = _SENTENCE_SPLIT_RE.split(text)
     avg_len = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
     if 15 < avg_len < 22:  # AI tends to produce uniform sentence lengths
         score += 20
         indicators.append("Unusually uniform sentence length pattern")
 
     # Check for absence of specific numbers/data (AI often avoids specifics)
-    has_numbers = bool(re.search(r'\d+%|\d+\s*(kg|tonnes|hectares|km)', text))
-    if not has_numbers and len(words) > 30:
+    if word_count > 30 and not _NUMBER_RE.search(text):
         score += 25
         indicators.append("No specific measurements or data points found")
 
     risk_level = "high" if score >= 50 else "medium" if score >= 25 else "low"
-    return {"risk": risk_level, "score": score, "indicators": indicators}
\ No newline at end of file
+    return {"risk": risk_level, "score": score, "indicators": indicators}
@@ -4,142 +4,236 @@ Predictive greenwashing detection — tracks seller recidivism
 and generates early alerts for high-risk listing patterns.
 """
 
+import sys
+import time
+from dataclasses import dataclass, field, fields, asdict
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, deque
+from itertools import islice
+
+
+@dataclass(slots=True)
+class Submission:
+    """A single recorded product submission."""
+    company: str
+    product: str
+    verdict: str
+    risk_score: int
+    claim_count: int
+    timestamp_ns: int
+    claim_phrases: list[str]
+
+
+@dataclass(slots=True)
+class SellerProfile:
+    """Cumulative recidivism profile for one seller."""
+    company: str  # display name, as first submitted
+    first_seen: int
+    last_seen: int
+    total_submissions: int = 0
+    greenwashed_count: int = 0
+    review_count: int = 0
+    verified_count: int = 0
+    total_risk_score: int = 0
+    recurring_phrases: Counter[str] = field(default_factory=Counter)
+    alert_level: str = "LOW"
+    avg_risk_score: int = 0
+
 
 # In-memory store for MVP (replace with DB in production)
-SUBMISSION_HISTORY: list[dict] = []
-SELLER_PROFILES: dict[str, dict] = {}
+# Audit log keeps only the most recent submissions; stats below cover all of them
+SUBMISSION_HISTORY: deque[Submission] = deque(maxlen=10000)
+SELLER_PROFILES: dict[str, SellerProfile] = {}
+
+# Running aggregates for the regulator dashboard, kept in step with the stores above
+_STATS = {
+    "total_scanned": 0,
+    "greenwashed": 0,
+    "under_review": 0,
+    "verified": 0,
+    "high_risk_sellers": 0,
+    "risk_sum": 0
+}
+
+# Sellers currently at MEDIUM or HIGH alert level, so alerts skip LOW-risk sellers.
+# A dict used as an ordered set keeps the alert order deterministic across processes
+_FLAGGED_SELLERS: dict[str, None] = {}
+
+_VERDICT_STAT_KEYS = {
+    "GREENWASHED": "greenwashed",
+    "REVIEW_REQUIRED": "under_review",
+    "VERIFIED": "verified"
+}
 
 
 def record_submission(company: str, product: str, verdict: str, risk_score: int, claims: list):
     """Record a product submission for recidivism tracking."""
-    entry = {
-        "company": company,
-        "product": product,
-        "verdict": verdict,
-        "risk_score": risk_score,
-        "claim_count": len(claims),
-        "timestamp": datetime.now().isoformat(),
-        "claim_phrases": [c["phrase"] for c in claims]
-    }
+    entry = Submission(
+        company=company,
+        product=product,
+        verdict=verdict,
+        risk_score=risk_score,
+        claim_count=len(claims),
+        timestamp_ns=time.time_ns(),
+        claim_phrases=[c["phrase"] for c in claims]
+    )
     SUBMISSION_HISTORY.append(entry)
-    _update_seller_profile(company, entry)
+    _update_platform_stats(entry)
+    _update_seller_profile(_normalize_company(company), entry)
 
 
-def _update_seller_profile(company: str, entry: dict):
-    """Update cumulative seller risk profile."""
-    if company not in SELLER_PROFILES:
-        SELLER_PROFILES[company] = {
-            "company": company,
-            "total_submissions": 0,
-            "greenwashed_count": 0,
-            "review_count": 0,
-            "verified_count": 0,
-            "total_risk_score": 0,
-            "recurring_phrases": defaultdict(int),
-            "first_seen": entry["timestamp"],
-            "last_seen": entry["timestamp"],
-            "alert_level": "LOW"
-        }
+def _normalize_company(company: str) -> str:
+    """
+    Profile key for a seller name, so case and surrounding whitespace
+    variants share one profile. Interned to speed up repeat lookups.
+    """
+    return sys.intern(company.strip().casefold())
 
-    profile = SELLER_PROFILES[company]
-    profile["total_submissions"] += 1
-    profile["total_risk_score"] += entry["risk_score"]
-    profile["last_seen"] = entry["timestamp"]
 
-    if entry["verdict"] == "GREENWASHED":
-        profile["greenwashed_count"] += 1
-    elif entry["verdict"] == "REVIEW_REQUIRED":
-        profile["review_count"] += 1
-    else:
-        profile["verified_count"] += 1
+def _update_platform_stats(entry: Submission):
+    """Fold a new submission into the running platform aggregates."""
+    _STATS["total_scanned"] += 1
+    _STATS["risk_sum"] += entry.risk_score
+    stat_key = _VERDICT_STAT_KEYS.get(entry.verdict)
+    if stat_key:
+        _STATS[stat_key] += 1
 
-    for phrase in entry["claim_phrases"]:
-        profile["recurring_phrases"][phrase] += 1
 
-    # Update alert level
-    profile["alert_level"] = _compute_alert_level(profile)
-    profile["avg_risk_score"] = round(profile["total_risk_score"] / profile["total_submissions"])
-    profile["recurring_phrases"] = dict(profile["recurring_phrases"])
+def _update_seller_profile(company_key: str, entry: Submission):
+    """Update cumulative seller risk profile."""
+    if company_key not in SELLER_PROFILES:
+        SELLER_PROFILES[company_key] = SellerProfile(
+            company=entry.company.strip(),
+            first_seen=entry.timestamp_ns,
+            last_seen=entry.timestamp_ns
+        )
+
+    profile = SELLER_PROFILES[company_key]
+    profile.total_submissions += 1
+    profile.total_risk_score += entry.risk_score
+    profile.last_seen = entry.timestamp_ns
+
+    if entry.verdict == "GREENWASHED":
+        profile.greenwashed_count += 1
+    elif entry.verdict == "REVIEW_REQUIRED":
+        profile.review_count += 1
+    else:
+        profile.verified_count += 1
 
+    profile.recurring_phrases.update(entry.claim_phrases)
 
-def _compute_alert_level(profile: dict) -> str:
+    # Update alert level
+    previous_level = profile.alert_level
+    profile.alert_level = _compute_alert_level(profile)
+    if previous_level != profile.alert_level:
+        if profile.alert_level == "HIGH":
+            _STATS["high_risk_sellers"] += 1
+        elif previous_level == "HIGH":
+            _STATS["high_risk_sellers"] -= 1
+
+        if profile.alert_level == "LOW":
+            _FLAGGED_SELLERS.pop(company_key, None)
+        else:
+            _FLAGGED_SELLERS[company_key] = None
+    profile.avg_risk_score = round(profile.total_risk_score / profile.total_submissions)
+
+
+def _compute_alert_level(profile: SellerProfile) -> str:
     """Compute seller alert level based on recidivism pattern."""
-    greenwash_rate = profile["greenwashed_count"] / max(profile["total_submissions"], 1)
+    greenwash_rate = profile.greenwashed_count / max(profile.total_submissions, 1)
 
-    if greenwash_rate >= 0.6 or profile["greenwashed_count"] >= 3:
+    if greenwash_rate >= 0.6 or profile.greenwashed_count >= 3:
         return "HIGH"
-    elif greenwash_rate >= 0.3 or profile["greenwashed_count"] >= 2:
+    elif greenwash_rate >= 0.3 or profile.greenwashed_count >= 2:
         return "MEDIUM"
     else:
         return "LOW"
 
 
+def _format_timestamp(timestamp_ns: int) -> str:
+    """Format a stored epoch-nanosecond timestamp as a local ISO 8601 string."""
+    # Integer split: going through a float seconds value rounds to the nearest
+    # microsecond instead of truncating like datetime.now() does
+    return datetime.fromtimestamp(timestamp_ns // 10**9).replace(
+        microsecond=timestamp_ns // 1000 % 10**6
+    ).isoformat()
+
+
 def get_seller_risk_profile(company: str) -> dict:
     """Get risk profile for a specific seller."""
-    return SELLER_PROFILES.get(company, {
-        "company": company,
-        "total_submissions": 0,
-        "alert_level": "LOW",
-        "message": "No prior submission history found"
-    })
+    profile = SELLER_PROFILES.get(_normalize_company(company))
+    if profile is None:
+        return {
+            "company": company,
+            "total_submissions": 0,
+            "alert_level": "LOW",
+            "message": "No prior submission history found"
+        }
+
+    # Shallow copy: asdict would deep-copy the whole phrase histogram
+    serialized = {f.name: getattr(profile, f.name) for f in fields(profile)}
+    serialized["recurring_phrases"] = dict(profile.recurring_phrases)
+    serialized["first_seen"] = _format_timestamp(profile.first_seen)
+    serialized["last_seen"] = _format_timestamp(profile.last_seen)
+    return serialized
 
 
 def get_early_alerts() -> list[dict]:
     """Get list of high-risk sellers for regulator early alert dashboard."""
     alerts = []
-    for company, profile in SELLER_PROFILES.items():
-        if profile["alert_level"] in ["HIGH", "MEDIUM"]:
-            # Find most repeated problematic phrases
-            recurring = sorted(
-                [(phrase, count) for phrase, count in profile.get("recurring_phrases", {}).items() if count > 1],
-                key=lambda x: x[1], reverse=True
-            )[:3]
-
-            alerts.append({
-                "company": company,
-                "alert_level": profile["alert_level"],
-                "greenwashed_count": profile["greenwashed_count"],
-                "total_submissions": profile["total_submissions"],
-                "avg_risk_score": profile.get("avg_risk_score", 0),
-                "recurring_patterns": [{"phrase": p, "occurrences": c} for p, c in recurring],
-                "recommended_action": _recommend_action(profile),
-                "last_seen": profile["last_seen"]
-            })
+    for company_key in _FLAGGED_SELLERS:
+        profile = SELLER_PROFILES[company_key]
+
+        # Find most repeated problematic phrases
+        recurring = [(p, c) for p, c in profile.recurring_phrases.most_common(3) if c > 1]
+
+        alerts.append({
+            "company": profile.company,
+            "alert_level": profile.alert_level,
+            "greenwashed_count": profile.greenwashed_count,
+            "total_submissions": profile.total_submissions,
+            "avg_risk_score": profile.avg_risk_score,
+            "recurring_patterns": [{"phrase": p, "occurrences": c} for p, c in recurring],
+            "recommended_action": _recommend_action(profile),
+            "last_seen": _format_timestamp(profile.last_seen)
+        })
 
     return sorted(alerts, key=lambda x: (x["alert_level"] == "HIGH", x["greenwashed_count"]), reverse=True)
 
 
-def _recommend_action(profile: dict) -> str:
+def _recommend_action(profile: SellerProfile) -> str:
     """Generate recommended regulatory action based on alert level."""
-    if profile["alert_level"] == "HIGH":
+    if profile.alert_level == "HIGH":
         return "Escalate for formal investigation — pattern of repeated greenwashing detected"
-    elif profile["alert_level"] == "MEDIUM":
+    elif profile.alert_level == "MEDIUM":
         return "Issue warning notice and require certification submission within 14 days"
     return "Monitor — flag for review if next submission is also non-compliant"
 
 
-def get_all_submissions() -> list[dict]:
-    """Return all submission history for regulator audit log."""
-    return list(reversed(SUBMISSION_HISTORY))
+def get_all_submissions(limit: int = 100, offset: int = 0) -> list[dict]:
+    """Return a page of submission history for regulator audit log, newest first."""
+    return [
+        _serialize_submission(entry)
+        for entry in islice(reversed(SUBMISSION_HISTORY), offset, offset + limit)
+    ]
+
+
+def _serialize_submission(entry: Submission) -> dict:
+    """Convert a stored submission into its API form with an ISO timestamp."""
+    serialized = asdict(entry)
+    del serialized["timestamp_ns"]
+    serialized["timestamp"] = _format_timestamp(entry.timestamp_ns)
+    return serialized
 
 
 def get_platform_stats() -> dict:
     """Aggregate stats for regulator dashboard."""
-    if not SUBMISSION_HISTORY:
-        return {
-            "total_scanned": 0, "greenwashed": 0,
-            "under_review": 0, "verified": 0,
-            "high_risk_sellers": 0, "avg_risk_score": 0
-        }
-
-    verdicts = [s["verdict"] for s in SUBMISSION_HISTORY]
+    total = _STATS["total_scanned"]
     return {
-        "total_scanned": len(SUBMISSION_HISTORY),
-        "greenwashed": verdicts.count("GREENWASHED"),
-        "under_review": verdicts.count("REVIEW_REQUIRED"),
-        "verified": verdicts.count("VERIFIED"),
-        "high_risk_sellers": sum(1 for p in SELLER_PROFILES.values() if p["alert_level"] == "HIGH"),
-        "avg_risk_score": round(sum(s["risk_score"] for s in SUBMISSION_HISTORY) / len(SUBMISSION_HISTORY))
-    }
\ No newline at end of file
+        "total_scanned": total,
+        "greenwashed": _STATS["greenwashed"],
+        "under_review": _STATS["under_review"],
+        "verified": _STATS["verified"],
+        "high_risk_sellers": _STATS["high_risk_sellers"],
+        "avg_risk_score": round(_STATS["risk_sum"] / total) if total else 0
+    }
@@ -4,180 +4,334 @@ Biodiversity Risk Exposure Scoring Engine.
 Computes greenwashing risk score and maps claims to SDG 15 targets.
 """
 
-import json
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Final, TypedDict
 
-DATA_DIR = Path(__file__).parent.parent / "data"
+import ahocorasick  # type: ignore[import-not-found]
+import orjson
 
-with open(DATA_DIR / "sdg15_targets.json") as f:
-    SDG_TARGETS = json.load(f)
+DATA_DIR: Final = Path(__file__).parent.parent / "data"
 
-with open(DATA_DIR / "greenwashing_keywords.json") as f:
-    KEYWORDS = json.load(f)
+# Immutable SDG 15 target records, keyed by target id
+SdgEntry = namedtuple("SdgEntry", ["target", "label", "severity", "keywords"])
+
+SDG_TARGETS: Final[dict[str, SdgEntry]] = {
+    target_id: SdgEntry(
+        target=target_id,
+        label=target_data["label"],
+        severity=target_data["severity"],
+        keywords=tuple(target_data.get("keywords", []))
+    )
+    for target_id, target_data in orjson.loads((DATA_DIR / "sdg15_targets.json").read_bytes()).items()
+}
+
+# Severities are also kept as fixed-point integers (severity x _SEVERITY_SCALE)
+# so risk score arithmetic stays in ints until the final division
+_SEVERITY_SCALE: Final = 100
+
+# Flat (keyword, target_id, label, severity, scaled_severity) table in lookup
+# priority order, with keywords pre-lowered. Longer keywords are more
+# discriminative, so the table is sorted by keyword length, longest first;
+# the sort is stable, so equal-length keywords keep target order
+SDG_KW_TABLE: Final[tuple[tuple[str, str, str, float, int], ...]] = tuple(sorted(
+    (
+        (keyword.lower(), entry.target, entry.label, entry.severity, round(entry.severity * _SEVERITY_SCALE))
+        for entry in SDG_TARGETS.values()
+        for keyword in entry.keywords
+    ),
+    key=lambda row: len(row[0]),
+    reverse=True
+))
+
+# Exact keyword -> (target_id, label, severity, scaled_severity); the first
+# target listing a keyword wins
+SDG_KW_EXACT: Final[dict[str, tuple[str, str, float, int]]] = {}
+for _keyword, _target_id, _label, _severity, _scaled_severity in SDG_KW_TABLE:
+    SDG_KW_EXACT.setdefault(_keyword, (_target_id, _label, _severity, _scaled_severity))
+
+# All keywords joined by NUL into one string, with each keyword's start
+# offset (plus a trailing sentinel), so "which keyword contains this
+# phrase" is a single str.find instead of a Python loop over the table
+_SDG_KW_BLOB: Final = "\0".join(keyword for keyword, *_ in SDG_KW_TABLE) + "\0"
+_SDG_KW_OFFSETS: Final[list[int]] = [0]
+for _keyword, *_ in SDG_KW_TABLE:
+    _SDG_KW_OFFSETS.append(_SDG_KW_OFFSETS[-1] + len(_keyword) + 1)
+
+# Phrases shorter than every keyword cannot meaningfully match one
+_MIN_KW_LEN: Final = min((len(keyword) for keyword, *_ in SDG_KW_TABLE), default=0)
+
+
+def _build_sdg_automaton() -> ahocorasick.Automaton:
+    """
+    Build a multi-pattern automaton over all SDG keywords so every keyword
+    contained in a phrase is found in one pass. Each keyword maps to its
+    row index in SDG_KW_TABLE.
+    """
+    automaton = ahocorasick.Automaton()
+    for idx, (keyword, *_) in enumerate(SDG_KW_TABLE):
+        if keyword not in automaton:
+            automaton.add_word(keyword, idx)
+    automaton.make_automaton()
+    return automaton
+
+
+_SDG_AUTOMATON: Final = _build_sdg_automaton()
 
 # Base weights per claim type
-CLAIM_WEIGHTS = {
+CLAIM_WEIGHTS: Final[dict[str, int]] = {
     "absolute": 40,
     "misleading": 30,
     "vague": 15
 }
 
 # Cert failure penalty weights
-CERT_STATUS_PENALTIES = {
+CERT_STATUS_PENALTIES: Final[dict[str, int]] = {
     "NOT_FOUND": 25,
     "EXPIRED": 20,
     "SCOPE_MISMATCH": 15,
     "NO_CERTS_CLAIMED": 10
 }
 
+# Score boost per AI-generated content risk level
+_AI_BOOSTS: Final[dict[str, int]] = {
+    "high": 15,
+    "medium": 8,
+    "low": 0
+}
+
+# Verdict and marketplace visibility impact per risk band (see _score_band);
+# impacts are shared read-only mappings, so scoring allocates nothing for them
+_VERDICTS: Final = ("VERIFIED", "REVIEW_REQUIRED", "GREENWASHED")
+
+_VIS_BOOST: Final = MappingProxyType({
+    "action": "BOOST",
+    "adjustment": "+25% search ranking",
+    "badge": "✓ Verified Green Product",
+    "badge_color": "green",
+    "description": "Product eligible for verified sustainability badge and search promotion"
+})
+_VIS_HOLD: Final = MappingProxyType({
+    "action": "HOLD",
+    "adjustment": "No ranking change — pending review",
+    "badge": "⚠ Under Review",
+    "badge_color": "amber",
+    "description": "Product listing held pending seller clarification or certification submission"
+})
+_VIS_DEMOTE: Final = MappingProxyType({
+    "action": "DEMOTE",
+    "adjustment": "-40% search ranking",
+    "badge": "✗ Unverified Claims",
+    "badge_color": "red",
+    "description": "Product demoted in search results until claims are verified or removed"
+})
+_VISIBILITY_IMPACTS: Final = (_VIS_BOOST, _VIS_HOLD, _VIS_DEMOTE)
+
+
+class ClaimDict(TypedDict):
+    """A detected claim as produced by nlp_engine.extract_claims."""
+    phrase: str
+    type: str
+    confidence: float
+    position: int
+    context: str
+
 
 def calculate_risk_score(
-    claims: list[dict],
-    cert_results: list[dict],
-    red_flags: list[dict],
+    claims: list[ClaimDict],
+    cert_results: list[dict[str, Any]],
+    red_flags: list[dict[str, Any]],
     has_proof_markers: bool,
-    ai_generated_risk: dict
-) -> dict:
+    ai_generated_risk: dict[str, Any],
+    detailed: bool = True
+) -> dict[str, Any]:
     """
     Calculate comprehensive greenwashing risk score (0-100).
     Returns score, verdict, SDG targets affected, and score breakdown.
+    With detailed=False only risk_score, verdict and visibility_impact are
+    returned and no breakdown is built, e.g. for search ranking.
     """
-    score = 0
-    breakdown = []
-    sdg_flags = {}
+    # Accumulated in _SEVERITY_SCALE units
+    score: int = 0
+    breakdown: list[dict[str, Any]] = []
+    seen_targets: set[str] = set()
+    sdg_entries: list[dict[str, Any]] = []
 
-    # 1. Score each detected claim
-    for claim in claims:
-        base = CLAIM_WEIGHTS.get(claim["type"], 10)
+    # Constant-cost penalties are computed first so non-detailed scoring
+    # can stop as soon as the score is certain to clamp at 100; breakdown
+    # entries still follow the claims -> certs -> proof -> flags -> AI order
 
-        # Find SDG target for this claim phrase
-        sdg_hit = _find_sdg_target(claim["phrase"])
-        multiplier = sdg_hit["severity"] if sdg_hit else 1.0
-        claim_score = base * multiplier
+    # 1. Penalise for no proof markers when claims exist
+    missing_proof = not has_proof_markers and len(claims) > 0
+    if missing_proof:
+        score += 10 * _SEVERITY_SCALE
 
-        score += claim_score
-        breakdown.append({
-            "source": f"Claim: '{claim['phrase']}'",
-            "type": claim["type"],
-            "points": round(claim_score, 1),
-            "sdg_target": sdg_hit["target"] if sdg_hit else None
-        })
-
-        if sdg_hit:
-            target_id = sdg_hit["target"]
-            if target_id not in sdg_flags:
-                sdg_flags[target_id] = SDG_TARGETS.get(target_id, {})
-                sdg_flags[target_id]["target"] = target_id
-
-    # 2. Penalise for failed certificates
+    # 2. Penalise for linguistic red flags
+    flag_penalty: int = min(len(red_flags) * 5, 20)
+    score += flag_penalty * _SEVERITY_SCALE
+
+    # 3. AI-generated content risk boost
+    ai_boost: int = _AI_BOOSTS.get(ai_generated_risk.get("risk", ""), 0)
+    score += ai_boost * _SEVERITY_SCALE
+
+    # 4. Penalise for failed certificates
+    cert_breakdown: list[dict[str, Any]] = []
+    cert_failures: int = 0
     for cert in cert_results:
-        penalty = CERT_STATUS_PENALTIES.get(cert["status"], 0)
+        if cert["status"] != "VERIFIED":
+            cert_failures += 1
+        penalty: int = CERT_STATUS_PENALTIES.get(cert["status"], 0)
         if penalty > 0:
-            score += penalty
+            score += penalty * _SEVERITY_SCALE
+            if detailed:
+                cert_breakdown.append({
+                    "source": f"Certificate: {cert['cert']} — {cert['status']}",
+                    "type": "cert_failure",
+                    "points": penalty,
+                    "sdg_target": None
+                })
+
+    # 5. Score each detected claim — the costly step, so it runs last
+    for claim in claims:
+        if score >= 100 * _SEVERITY_SCALE and not detailed:
+            break
+
+        base: int = CLAIM_WEIGHTS.get(claim["type"], 10)
+
+        # Find SDG target for this claim phrase; the cached
+        # (target, label, severity, scaled_severity) tuple is used as-is
+        sdg_hit = _find_sdg_target_cached(claim["phrase"].lower())
+        target_id: str | None = sdg_hit[0] if sdg_hit else None
+        claim_score: int = base * (sdg_hit[3] if sdg_hit else _SEVERITY_SCALE)
+
+        score += claim_score
+        if detailed:
+            breakdown.append({
+                "source": f"Claim: '{claim['phrase']}'",
+                "type": claim["type"],
+                "points": round(claim_score / _SEVERITY_SCALE, 1),
+                "sdg_target": target_id
+            })
+
+            if sdg_hit and sdg_hit[0] not in seen_targets:
+                seen_targets.add(sdg_hit[0])
+                sdg_entries.append(SDG_TARGETS[sdg_hit[0]]._asdict())
+
+    if detailed:
+        breakdown.extend(cert_breakdown)
+        if missing_proof:
+            breakdown.append({
+                "source": "No verifiable proof markers found in description",
+                "type": "missing_proof",
+                "points": 10,
+                "sdg_target": None
+            })
+        if flag_penalty > 0:
             breakdown.append({
-                "source": f"Certificate: {cert['cert']} — {cert['status']}",
-                "type": "cert_failure",
-                "points": penalty,
+                "source": f"{len(red_flags)} linguistic red flag(s) detected",
+                "type": "linguistic_flags",
+                "points": flag_penalty,
+                "sdg_target": None
+            })
+        if ai_boost > 0:
+            breakdown.append({
+                "source": f"Possible AI-generated greenwashing content detected",
+                "type": "ai_generated_risk",
+                "points": ai_boost,
                 "sdg_target": None
             })
 
-    # 3. Penalise for no proof markers when claims exist
-    if not has_proof_markers and len(claims) > 0:
-        score += 10
-        breakdown.append({
-            "source": "No verifiable proof markers found in description",
-            "type": "missing_proof",
-            "points": 10,
-            "sdg_target": None
-        })
-
-    # 4. Penalise for linguistic red flags
-    if len(red_flags) > 0:
-        flag_penalty = min(len(red_flags) * 5, 20)
-        score += flag_penalty
-        breakdown.append({
-            "source": f"{len(red_flags)} linguistic red flag(s) detected",
-            "type": "linguistic_flags",
-            "points": flag_penalty,
-            "sdg_target": None
-        })
-
-    # 5. AI-generated content risk boost
-    ai_boost = {"high": 15, "medium": 8, "low": 0}.get(ai_generated_risk.get("risk", "low"), 0)
-    if ai_boost > 0:
-        score += ai_boost
-        breakdown.append({
-            "source": f"Possible AI-generated greenwashing content detected",
-            "type": "ai_generated_risk",
-            "points": ai_boost,
-            "sdg_target": None
-        })
-
-    final_score = min(round(score), 100)
+    final_score: int = min(round(score / _SEVERITY_SCALE), 100)
     verdict = _classify_verdict(final_score)
     visibility_impact = _calculate_visibility_impact(final_score)
 
+    if not detailed:
+        return {
+            "risk_score": final_score,
+            "verdict": verdict,
+            "visibility_impact": visibility_impact
+        }
+
     return {
         "risk_score": final_score,
         "verdict": verdict,
-        "sdg_targets_affected": list(sdg_flags.values()),
+        "sdg_targets_affected": sdg_entries,
         "score_breakdown": breakdown,
         "visibility_impact": visibility_impact,
         "total_claims": len(claims),
-        "total_cert_failures": sum(1 for c in cert_results if c["status"] != "VERIFIED")
+        "total_cert_failures": cert_failures
     }
 
 
-def _find_sdg_target(phrase: str) -> dict | None:
-    """Find the SDG 15 target most relevant to a detected claim phrase."""
-    phrase_lower = phrase.lower()
-    for target_id, target_data in SDG_TARGETS.items():
-        for keyword in target_data.get("keywords", []):
-            if keyword.lower() in phrase_lower or phrase_lower in keyword.lower():
-                return {
-                    "target": target_id,
-                    "label": target_data["label"],
-                    "severity": target_data["severity"]
-                }
-    return None
+def calculate_risk_scores_batch(products: list[dict[str, Any]], detailed: bool = True) -> list[dict[str, Any]]:
+    """
+    Score many products in one call, e.g. a marketplace catalogue.
+    Each product dict holds the keyword arguments of calculate_risk_score.
+    Claim phrases shared across the batch resolve their SDG target once.
+    """
+    return [calculate_risk_score(**product, detailed=detailed) for product in products]
+
+
+@lru_cache(maxsize=4096)
+def _find_sdg_target_cached(phrase_lower: str) -> tuple[str, str, float, int] | None:
+    """
+    Find the SDG 15 target most relevant to a lowercased claim phrase, as
+    a (target_id, label, severity, scaled_severity) tuple. Claim phrases
+    repeat heavily across a catalogue, and the SDG table is fixed at
+    import, so results are cached per phrase.
+    """
+    if len(phrase_lower) < _MIN_KW_LEN:
+        return None
+
+    # Exact keyword matches are the most specific: whole phrase, then
+    # single words, then two-word sequences
+    hit = SDG_KW_EXACT.get(phrase_lower)
+    if hit:
+        return hit
+    tokens: list[str] = phrase_lower.split()
+    for token in tokens:
+        hit = SDG_KW_EXACT.get(token)
+        if hit:
+            return hit
+    for first, second in zip(tokens, tokens[1:]):
+        hit = SDG_KW_EXACT.get(f"{first} {second}")
+        if hit:
+            return hit
+
+    # Earliest (longest) keyword contained in the phrase
+    best: int = len(SDG_KW_TABLE)
+    for _, idx in _SDG_AUTOMATON.iter(phrase_lower):
+        best = min(best, idx)
+
+    # An earlier keyword containing the phrase takes priority
+    if "\0" not in phrase_lower:
+        pos = _SDG_KW_BLOB.find(phrase_lower, 0, _SDG_KW_OFFSETS[best])
+        if pos != -1:
+            best = bisect_right(_SDG_KW_OFFSETS, pos) - 1
+
+    if best == len(SDG_KW_TABLE):
+        return None
+
+    _, target_id, label, severity, scaled_severity = SDG_KW_TABLE[best]
+    return target_id, label, severity, scaled_severity
+
+
+def _score_band(score: int) -> int:
+    """Risk band index: 0 below 20, 1 below 50, 2 otherwise."""
+    return (score >= 20) + (score >= 50)
 
 
 def _classify_verdict(score: int) -> str:
     """Classify final verdict based on risk score."""
-    if score < 20:
-        return "VERIFIED"
-    elif score < 50:
-        return "REVIEW_REQUIRED"
-    else:
-        return "GREENWASHED"
+    return _VERDICTS[_score_band(score)]
 
 
-def _calculate_visibility_impact(score: int) -> dict:
+def _calculate_visibility_impact(score: int) -> MappingProxyType[str, str]:
     """
     Calculate marketplace visibility impact based on risk score.
     Verified products get boosts; greenwashed products get demoted.
     """
-    if score < 20:
-        return {
-            "action": "BOOST",
-            "adjustment": "+25% search ranking",
-            "badge": "✓ Verified Green Product",
-            "badge_color": "green",
-            "description": "Product eligible for verified sustainability badge and search promotion"
-        }
-    elif score < 50:
-        return {
-            "action": "HOLD",
-            "adjustment": "No ranking change — pending review",
-            "badge": "⚠ Under Review",
-            "badge_color": "amber",
-            "description": "Product listing held pending seller clarification or certification submission"
-        }
-    else:
-        return {
-            "action": "DEMOTE",
-            "adjustment": "-40% search ranking",
-            "badge": "✗ Unverified Claims",
-            "badge_color": "red",
-            "description": "Product demoted in search results until claims are verified or removed"
-        }
\ No newline at end of file
+    return _VISIBILITY_IMPACTS[_score_band(score)]